@@ -1,6 +1,7 @@
 """Default configuration for mink.
 
 Can be overridden with config.py in instance folder.
+String values may refer to environment variables like this: "${env:VAR}" or "${env:VAR:-default}".
 """
 
 LOG_LEVEL = "INFO"   # Log level for the application
@@ -37,6 +38,10 @@ SPARV_IMPORTER_MODULES = {  # File extensions for corpus input and the modules t
 
 # Settings for the server where Sparv is run
 SSH_KEY = "~/.ssh/id_rsa"
+SSH_CONTROL_DIR = ""         # Dir for sockets used to share one ssh connection between commands, e.g. "~/.ssh" (off if empty)
+SSH_CONTROL_PERSIST = "60s"  # How long a shared ssh connection is kept open after its last command
+# Note: all simultaneous ssh/rsync commands (from all app workers) run as sessions of the shared connection. sshd
+# refuses sessions above its MaxSessions limit (default 10), so raise MaxSessions on the Sparv server if needed.
 SPARV_HOST = ""  # Define this in instance/config.py!
 SPARV_USER = ""    # Define this in instance/config.py!
 SPARV_WORKERS = 1  # Number of available Sparv workers
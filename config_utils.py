@@ -0,0 +1,30 @@
+"""Helpers for loading the mink config, shared by the mink app and the queue manager.
+
+This module must not depend on the mink package, so that the queue manager can use it without loading the app.
+"""
+
+import os
+import re
+
+_ENV_VAR_RE = re.compile(r"\$\{\s*env:([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*?))?\s*\}")
+
+
+def expand_env_vars(config):
+    """Replace references to environment variables in string config values with the values of the variables.
+
+    References are written as '${env:VAR}'. A default value for unset variables can be given like this:
+    '${env:VAR:-default}'. Plain '${VAR}' is left as it is, since it may be meant for the shell on the Sparv server
+    (e.g. in SPARV_ENVIRON).
+    """
+    def replace(matchobj):
+        name, default = matchobj.groups()
+        if name in os.environ:
+            return os.environ[name]
+        if default is not None:
+            return default
+        raise ValueError(f"Environment variable {name!r} used in {key!r} is not set.")
+
+    for key, value in config.items():
+        # Most values do not contain any references, so avoid running the regex on them
+        if isinstance(value, str) and "${" in value:
+            config[key] = _ENV_VAR_RE.sub(replace, value)
@@ -3,14 +3,17 @@
 __version__ = "1.1.0"
 
 import logging
+import os
 import shutil
 import sys
 import time
 from pathlib import Path
 
+import requests
 from flask import Flask, g, request
 from flask_cors import CORS
 
+from config_utils import expand_env_vars
 from mink.core import registry, utils
 from mink.memcached.cache import Cache
 from mink.sb_auth.login import read_jwt_key
@@ -34,11 +37,19 @@ def create_app(debug=False):
     if instance_config_path.is_file():
         app.config.from_pyfile(str(instance_config_path))
 
+    # Insert values from environment variables referenced in the config
+    expand_env_vars(app.config)
+
     # Make sure required config variables are set
     for var in ("SPARV_HOST", "SPARV_USER"):
         if not app.config.get(var):
             raise ValueError(f"{var!r} is not set.")
 
+    # Expand local paths once (paths used in Sparv commands are left as they are since they refer to the Sparv server)
+    app.config["SSH_KEY"] = os.path.expanduser(app.config.get("SSH_KEY"))
+    if app.config.get("SSH_CONTROL_DIR"):
+        app.config["SSH_CONTROL_DIR"] = os.path.expanduser(app.config.get("SSH_CONTROL_DIR"))
+
     # Configure logger
     logfmt = "%(asctime)-15s - %(levelname)s: %(message)s"
     datefmt = "%Y-%m-%d %H:%M:%S"
@@ -59,6 +70,9 @@ def create_app(debug=False):
         log_level = getattr(logging, app.config.get("LOG_LEVEL", "INFO").upper())
         logging.basicConfig(filename=logfile, level=log_level, format=logfmt, datefmt=datefmt)
 
+    # Share one HTTP session (and thereby its connection pool) for all requests to sb-auth and other web services
+    app.extensions["http_session"] = requests.Session()
+
     with app.app_context():
         # Connect to cache and init the resource registry
         g.cache = Cache()
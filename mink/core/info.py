@@ -1,9 +1,11 @@
 """Class defining resource info objects."""
 
-import json
+import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 
+import orjson
 from flask import current_app as app
 from flask import g
 
@@ -47,7 +49,20 @@ class Info:
 
     def to_dict(self):
         """Recursively transform class data into dict (also transforming the data of its children)."""
-        return json.loads(json.dumps(self, default=lambda x: x.serialize()))
+        return orjson.loads(self.dumps())
+
+    def dumps(self, process_output: bool = True) -> bytes:
+        """Serialize class data (including the data of its children) into JSON.
+
+        If 'process_output' is False, the Sparv output of the job is left out (which saves a call to the Sparv server).
+        """
+        def serialize(obj):
+            if isinstance(obj, Job):
+                return obj.serialize(process_output=process_output)
+            return obj.serialize()
+
+        # Pass dict subclasses (like JobStatuses) on to their own serialize method
+        return orjson.dumps(self, default=serialize, option=orjson.OPT_PASSTHROUGH_SUBCLASS)
 
     def create(self):
         """Create new info object in cache and filesystem."""
@@ -61,7 +76,7 @@ class Info:
 
     def update(self):
         """Write an info item to the cache and filesystem."""
-        dump = json.dumps(self, default=lambda x: x.serialize())
+        dump = self.dumps(process_output=False)
 
         g.cache.set_job(self.id, dump)
 
@@ -70,8 +85,22 @@ class Info:
         subdir = registry_dir / self.id[len(app.config.get("RESOURCE_PREFIX"))]
         subdir.mkdir(parents=True, exist_ok=True)
         backup_file = subdir / Path(self.id)
-        with backup_file.open("w") as f:
-            f.write(dump)
+        # Write to a temporary file first and replace the backup file with it, so that the backup file is never left
+        # half-written. The temporary file lives outside the subdirs where it would be mistaken for a backup file.
+        f = tempfile.NamedTemporaryFile(dir=registry_dir, prefix=f".{self.id}.", delete=False)
+        try:
+            with f:
+                f.write(dump)
+            # Temporary files are only readable by their owner, so give it the permissions of the old backup file
+            try:
+                mode = backup_file.stat().st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(f.name, mode)
+            os.replace(f.name, backup_file)
+        except Exception:
+            Path(f.name).unlink(missing_ok=True)
+            raise
 
     def remove(self, abort_job=False):
         """Remove an info item from the cache and file system."""
@@ -108,7 +137,7 @@ class Info:
 
 def load_from_str(jsonstr):
     """Load an Info instance from a json string."""
-    json_info = json.loads(jsonstr)
+    json_info = orjson.loads(jsonstr)
     resource_id = json_info["resource"]["id"]
     return Info(resource_id,
                 resource=Resource(**json_info.get("resource")),
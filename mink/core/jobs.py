@@ -1,13 +1,15 @@
 """Utilities related to Sparv jobs."""
 
+import concurrent.futures
+import contextlib
 import datetime
-import json
+import functools
 import re
 import shlex
 import subprocess
 from typing import Optional
 
-import dateutil
+import orjson
 from flask import current_app as app
 
 from mink.core import exceptions, registry, utils
@@ -15,6 +17,14 @@ from mink.core.status import JobStatuses, ProcessName, Status
 from mink.sparv import storage
 from mink.sparv import utils as sparv_utils
 
+# Time output ("real", "user" and "sys") written to the nohup file by 'time -p'
+TIME_OUTPUT_RE = re.compile(r"(?:(real)|user|sys) (\d.+)")
+# A language in the output of 'sparv languages'
+LANGUAGE_RE = re.compile(r"(.+?)\s+(\S+)$")
+# An export in the output of 'sparv run -l' and its description (which may continue on lines indented by four spaces)
+EXPORT_RE = re.compile(r"^(?! {4}) *(\S+)[ \t]+(.+(?:\n {4}.+)*)", re.MULTILINE)
+IGNORED_EXPORT_NAMES = frozenset(("Other", "Note:", "what", "'export.default'"))
+
 
 class Job():
     """A job item holding information about a Sparv job."""
@@ -49,22 +59,21 @@ class Job():
         self.installed_korp = installed_korp
         self.installed_strix = installed_strix
         self.latest_seconds_taken = latest_seconds_taken
+        self._parsed_started = (None, None)
         self.progress_output = 0
-
-        self.sparv_user = app.config.get("SPARV_USER")
-        self.sparv_server = app.config.get("SPARV_HOST")
-        self.nohupfile = app.config.get("SPARV_NOHUP_FILE")
-        self.runscript = app.config.get("SPARV_TMP_RUN_SCRIPT")
-        self.remote_corpus_dir = str(sparv_utils.get_corpus_dir(self.id))
+        self._batch_depth = 0
+        self._unsaved_changes = False
 
     def __str__(self):
         return str(self.serialize())
 
-    def serialize(self):
-        """Convert class data into dict."""
-        warnings, errors, misc_output = self.get_output()
-        priority = registry.get_priority(self) if not registry.get_priority(self) == -1 else ""
-        return {
+    def serialize(self, process_output: bool = True):
+        """Convert class data into dict.
+
+        Unless 'process_output' is False, the current Sparv output and queue priority are included as well (these are
+        needed in responses but are not part of the job state, so they are left out when saving the job).
+        """
+        data = {
             "status": self.status,
             "current_process": self.current_process,
             "pid": self.pid,
@@ -75,8 +84,16 @@ class Job():
             "install_scrambled": self.install_scrambled,
             "installed_korp": self.installed_korp,
             "installed_strix": self.installed_strix,
-            "latest_seconds_taken": self.latest_seconds_taken,
+            "latest_seconds_taken": self.latest_seconds_taken
+            }
+        if not process_output:
+            return data
 
+        warnings, errors, misc_output = self.get_output()
+        priority = registry.get_priority(self)
+        if priority == -1:
+            priority = ""
+        data.update({
             "priority": priority,
             "warnings": warnings,
             "errors": errors,
@@ -84,12 +101,54 @@ class Job():
             "last_run_started": self.started or "",
             "last_run_ended": self.done or "",
             "progress": self.progress or ""
-            }
+            })
+        return data
+
+    # Settings and paths on the Sparv server are only looked up when needed (most jobs are only loaded to check their
+    # status) and then kept for the lifetime of the job object
+    @functools.cached_property
+    def sparv_user(self):
+        return app.config.get("SPARV_USER")
+
+    @functools.cached_property
+    def sparv_server(self):
+        return app.config.get("SPARV_HOST")
+
+    @functools.cached_property
+    def nohupfile(self):
+        return app.config.get("SPARV_NOHUP_FILE")
+
+    @functools.cached_property
+    def runscript(self):
+        return app.config.get("SPARV_TMP_RUN_SCRIPT")
+
+    @functools.cached_property
+    def remote_corpus_dir(self):
+        return str(sparv_utils.get_corpus_dir(self.id))
 
     def set_parent(self, parent):
         """Save reference to parent class."""
         self.parent = parent
 
+    @contextlib.contextmanager
+    def batch(self):
+        """Collect all changes made within this context and save them once when leaving it."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._unsaved_changes:
+                self._save()
+
+    def _save(self):
+        """Save job info (unless changes are being collected by 'batch')."""
+        if self._batch_depth:
+            self._unsaved_changes = True
+            return
+        self._unsaved_changes = False
+        self.parent.update()
+
     def set_status(self, status: Status, process: Optional[ProcessName] = None):
         """Change the status of a job."""
         if process is None:
@@ -100,33 +159,33 @@ class Job():
             self.status[process] = status
             if self.status.is_active():
                 self.current_process = process
-            self.parent.update()
+            self._save()
 
     def set_pid(self, pid):
         """Set pid of job and save."""
         self.pid = pid
-        self.parent.update()
+        self._save()
 
     def set_install_scrambled(self, scramble):
         """Set status of 'install_scrambled' and save."""
         self.install_scrambled = scramble
-        self.parent.update()
+        self._save()
 
     def set_sparv_exports(self, sparv_exports):
         """Set the Sparv exports to be created during the next run."""
         self.sparv_exports = sparv_exports
-        self.parent.update()
+        self._save()
 
     def set_current_files(self, current_files):
         """Set the input files to be processed during the next run."""
         self.current_files = current_files
-        self.parent.update()
+        self._save()
 
     def set_latest_seconds_taken(self, seconds_taken):
         """Set 'latest_seconds_taken' and save."""
         if self.latest_seconds_taken != seconds_taken:
             self.latest_seconds_taken = seconds_taken
-            self.parent.update()
+            self._save()
 
     def reset_time(self):
         """Reset the processing time for a job (e.g. when starting a new one)."""
@@ -134,7 +193,7 @@ class Job():
         # self.started = None
         self.done = None
         self.sparv_done = None
-        self.parent.update()
+        self._save()
 
     def check_requirements(self):
         """Check if required corpus contents are present."""
@@ -170,83 +229,77 @@ class Job():
             self.set_status(Status.error)
             raise Exception(f"Failed to download corpus '{self.id}' from the storage server! {e}")
 
-        # Sync corpus config to Sparv server
-        p = subprocess.run(["rsync", "-av", utils.get_config_file(self.id),
-                            f"{self.sparv_user}@{self.sparv_server}:~/{self.remote_corpus_dir}/"],
-                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if p.stderr:
-            self.set_status(Status.error)
-            raise Exception(f"Failed to copy corpus config file to Sparv server! {p.stderr.decode()}")
-
-        # Sync corpus files to Sparv server
-        # TODO: do this async!
+        # Sync corpus config and corpus files to Sparv server (both transfers are run in parallel)
         local_source_dir = utils.get_source_dir(self.id)
-        p = subprocess.run(["rsync", "-av", "--delete", local_source_dir,
-                            f"{self.sparv_user}@{self.sparv_server}:~/{self.remote_corpus_dir}/"],
-                           stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if p.stderr:
+        ssh_args = utils.rsync_ssh_args(self.sparv_user, self.sparv_server)
+        config_p = subprocess.Popen(["rsync", "-av", *ssh_args, utils.get_config_file(self.id),
+                                     f"{self.sparv_user}@{self.sparv_server}:~/{self.remote_corpus_dir}/"],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        source_p = subprocess.Popen(["rsync", "-av", *ssh_args, "--delete", local_source_dir,
+                                     f"{self.sparv_user}@{self.sparv_server}:~/{self.remote_corpus_dir}/"],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _, config_stderr = config_p.communicate()
+        _, source_stderr = source_p.communicate()
+        if config_stderr:
             self.set_status(Status.error)
-            raise Exception(f"Failed to copy corpus files to Sparv server! {p.stderr.decode()}")
+            raise Exception(f"Failed to copy corpus config file to Sparv server! {config_stderr.decode()}")
+        if source_stderr:
+            self.set_status(Status.error)
+            raise Exception(f"Failed to copy corpus files to Sparv server! {source_stderr.decode()}")
 
         self.set_status(Status.done)
 
     def run_sparv(self):
         """Start a Sparv annotation process."""
-        sparv_env = app.config.get("SPARV_ENVIRON")
         sparv_command = f"{app.config.get('SPARV_COMMAND')} {app.config.get('SPARV_RUN')} {' '.join(self.sparv_exports)}"
         if self.current_files:
             sparv_command += f" --file {' '.join(shlex.quote(f) for f in self.current_files)}"
-        script_content = f"{sparv_env} nohup time -p {sparv_command} >{self.nohupfile} 2>&1 &\necho $!"
-        self.started = datetime.datetime.now().astimezone().isoformat(timespec="seconds")
-        p = utils.ssh_run(f"cd {shlex.quote(self.remote_corpus_dir)} && "
-                          f"echo {shlex.quote(script_content)} > {shlex.quote(self.runscript)} && "
-                          f"chmod +x {shlex.quote(self.runscript)} && ./{shlex.quote(self.runscript)}")
+        p = self._run_script(sparv_command)
 
         if p.returncode != 0:
             stderr = p.stderr.decode() if p.stderr else ""
-            self.reset_time()
-            self.set_status(Status.error, ProcessName.sparv)
+            with self.batch():
+                self.reset_time()
+                self.set_status(Status.error, ProcessName.sparv)
             raise exceptions.JobError(f"Failed to run Sparv! {stderr}")
 
         # Get pid from Sparv process and store job info
-        try:
-            float(p.stdout.decode())
-            self.set_pid(int(p.stdout.decode()))
-        except ValueError:
-            pass
-        self.set_status(Status.running, ProcessName.sparv)
+        with self.batch():
+            try:
+                float(p.stdout.decode())
+                self.set_pid(int(p.stdout.decode()))
+            except ValueError:
+                pass
+            self.set_status(Status.running, ProcessName.sparv)
 
     def install_korp(self):
         """Install a corpus in Korp."""
-        sparv_installs = app.config.get("SPARV_DEFAULT_KORP_INSTALLS")
+        # Copy the default installs, the config value must not be extended on every call
+        sparv_installs = list(app.config.get("SPARV_DEFAULT_KORP_INSTALLS"))
         if self.install_scrambled:
             sparv_installs.append("cwb:install_corpus_scrambled")
         else:
-            sparv_installs.extend(["cwb:install_corpus"])
+            sparv_installs.append("cwb:install_corpus")
 
-        sparv_env = app.config.get("SPARV_ENVIRON")
         sparv_command = f"{app.config.get('SPARV_COMMAND')} {app.config.get('SPARV_INSTALL')} {' '.join(sparv_installs)}"
-
-        script_content = f"{sparv_env} nohup time -p sh -c {shlex.quote(sparv_command)} >{self.nohupfile} 2>&1 &\necho $!"
-        self.started = datetime.datetime.now().astimezone().isoformat(timespec="seconds")
-        p = utils.ssh_run(f"cd {shlex.quote(self.remote_corpus_dir)} && "
-                          f"echo {shlex.quote(script_content)} > {shlex.quote(self.runscript)} && "
-                          f"chmod +x {shlex.quote(self.runscript)} && ./{shlex.quote(self.runscript)}")
+        p = self._run_script(f"sh -c {shlex.quote(sparv_command)}")
 
         if p.returncode != 0:
             stderr = p.stderr.decode() if p.stderr else ""
-            self.reset_time()
-            self.set_status(Status.error, ProcessName.korp)
+            with self.batch():
+                self.reset_time()
+                self.set_status(Status.error, ProcessName.korp)
             raise exceptions.JobError(f"Failed to install corpus in Korp. {stderr}")
 
-        self.installed_korp = True
         # Get pid from Sparv process and store job info
-        try:
-            float(p.stdout.decode())
-            self.set_pid(int(p.stdout.decode()))
-        except ValueError:
-            pass
-        self.set_status(Status.running, ProcessName.korp)
+        with self.batch():
+            self.installed_korp = True
+            try:
+                float(p.stdout.decode())
+                self.set_pid(int(p.stdout.decode()))
+            except ValueError:
+                pass
+            self.set_status(Status.running, ProcessName.korp)
 
     def uninstall_korp(self):
         """Uninstall corpus from Korp."""
@@ -273,29 +326,25 @@ class Job():
     def install_strix(self):
         """Install a corpus in Strix."""
         sparv_installs = app.config.get("SPARV_DEFAULT_STRIX_INSTALLS")
-        sparv_env = app.config.get("SPARV_ENVIRON")
         sparv_command = f"{app.config.get('SPARV_COMMAND')} {app.config.get('SPARV_INSTALL')} {' '.join(sparv_installs)}"
-
-        script_content = f"{sparv_env} nohup time -p sh -c {shlex.quote(sparv_command)} >{self.nohupfile} 2>&1 &\necho $!"
-        self.started = datetime.datetime.now().astimezone().isoformat(timespec="seconds")
-        p = utils.ssh_run(f"cd {shlex.quote(self.remote_corpus_dir)} && "
-                          f"echo {shlex.quote(script_content)} > {shlex.quote(self.runscript)} && "
-                          f"chmod +x {shlex.quote(self.runscript)} && ./{shlex.quote(self.runscript)}")
+        p = self._run_script(f"sh -c {shlex.quote(sparv_command)}")
 
         if p.returncode != 0:
             stderr = p.stderr.decode() if p.stderr else ""
-            self.reset_time()
-            self.set_status(Status.error, ProcessName.strix)
+            with self.batch():
+                self.reset_time()
+                self.set_status(Status.error, ProcessName.strix)
             raise exceptions.JobError(f"Failed to install corpus in Strix. {stderr}")
 
-        self.installed_strix = True
         # Get pid from Sparv process and store job info
-        try:
-            float(p.stdout.decode())
-            self.set_pid(int(p.stdout.decode()))
-        except ValueError:
-            pass
-        self.set_status(Status.running, ProcessName.strix)
+        with self.batch():
+            self.installed_strix = True
+            try:
+                float(p.stdout.decode())
+                self.set_pid(int(p.stdout.decode()))
+            except ValueError:
+                pass
+            self.set_status(Status.running, ProcessName.strix)
 
     def uninstall_strix(self):
         """Uninstall corpus from Strix."""
@@ -319,6 +368,17 @@ class Job():
 
         self.installed_strix = False
 
+    def _run_script(self, command):
+        """Start 'command' in the background on the Sparv server via the job's run script and return the ssh process.
+
+        The output of the command is written to the nohup file and the run script prints the pid of the process.
+        """
+        script_content = f"{app.config.get('SPARV_ENVIRON')} nohup time -p {command} >{self.nohupfile} 2>&1 &\necho $!"
+        self.started = datetime.datetime.now().astimezone().isoformat(timespec="seconds")
+        return utils.ssh_run(f"cd {shlex.quote(self.remote_corpus_dir)} && "
+                             f"echo {shlex.quote(script_content)} > {shlex.quote(self.runscript)} && "
+                             f"chmod +x {shlex.quote(self.runscript)} && ./{shlex.quote(self.runscript)}")
+
     def abort_sparv(self):
         """Abort running Sparv process."""
         if self.status.is_waiting(self.current_process):
@@ -334,52 +394,60 @@ class Job():
 
         p = utils.ssh_run(f"kill -SIGTERM {self.pid}")
         if p.returncode == 0:
-            self.set_pid(None)
-            self.set_status(Status.aborted)
+            with self.batch():
+                self.set_pid(None)
+                self.set_status(Status.aborted)
         else:
             stderr = p.stderr.decode()
             # Ignore 'no such process' error
             if stderr.endswith("Processen finns inte\n") or stderr.endswith("No such process\n"):
-                self.set_pid(None)
-                self.set_status(Status.aborted)
+                with self.batch():
+                    self.set_pid(None)
+                    self.set_status(Status.aborted)
             else:
                 raise exceptions.JobError(f"Failed to abort job! Error: '{stderr}'")
 
     def process_running(self):
         """Check if process with this job's pid is still running on Sparv server."""
+        nohup_output = None
         if self.pid:
-            p = utils.ssh_run(f"kill -0 {self.pid}")
+            # Check if the process is running and otherwise read its output, using only one call to the Sparv server
+            p = utils.ssh_run(f"kill -0 {self.pid} || {{ cd {shlex.quote(self.remote_corpus_dir)} && "
+                              f"cat {shlex.quote(self.nohupfile)}; exit 1; }}")
             # Process is running, do nothing
             if p.returncode == 0:
                 return True
-            # Process not running anymore
+            # Process not running anymore (on other exit codes, e.g. from ssh itself, the output is read separately)
+            if p.returncode == 1:
+                nohup_output = p.stdout.decode()
             app.logger.debug(f"stderr: '{p.stderr.decode()}'")
-            self.set_pid(None)
 
-        _warnings, errors, misc = self.get_output()
-        if (self.progress_output == 100):
-            if self.status.is_running(self.current_process):
-                self.set_status(Status.done)
-        else:
-            if errors:
-                app.logger.debug(f"Error in Sparv: {errors}")
-            if misc:
-                app.logger.debug(f"Sparv output: {misc}")
-            app.logger.debug("Sparv process was not completed successfully.")
-            self.set_status(Status.error)
+        with self.batch():
+            if self.pid:
+                self.set_pid(None)
+            _warnings, errors, misc = self.get_output(nohup_output)
+            if (self.progress_output == 100):
+                if self.status.is_running(self.current_process):
+                    self.set_status(Status.done)
+            else:
+                if errors:
+                    app.logger.debug(f"Error in Sparv: {errors}")
+                if misc:
+                    app.logger.debug(f"Sparv output: {misc}")
+                app.logger.debug("Sparv process was not completed successfully.")
+                self.set_status(Status.error)
         return False
 
-    def get_output(self):
-        """Check latest Sparv output of this job by reading the nohup file."""
+    def get_output(self, nohup_output: Optional[str] = None):
+        """Check latest Sparv output of this job by reading the nohup file (unless its contents are already given)."""
         if not self.status.has_process_output(self.current_process):
             return "", "", ""
 
-        nohupfile = app.config.get("SPARV_NOHUP_FILE")
-        remote_corpus_dir = str(sparv_utils.get_corpus_dir(self.id))
-
-        p = utils.ssh_run(f"cd {shlex.quote(remote_corpus_dir)} && cat {shlex.quote(nohupfile)}")
+        if nohup_output is None:
+            p = utils.ssh_run(f"cd {shlex.quote(self.remote_corpus_dir)} && cat {shlex.quote(self.nohupfile)}")
+            nohup_output = p.stdout.decode() if p.stdout else ""
 
-        stdout = p.stdout.decode().strip() if p.stdout else ""
+        stdout = nohup_output.strip()
         warnings = errors = misc = ""
         progress = 0
         if stdout:
@@ -387,8 +455,16 @@ class Job():
             errors = []
             misc = []
             for line in stdout.split("\n"):
+                if not line.startswith("{"):
+                    # Catch "real" time output, ignore "user" and "sys" time output
+                    matchobj = TIME_OUTPUT_RE.match(line)
+                    if matchobj and matchobj.group(1):
+                        real_seconds = float(matchobj.group(2).strip())
+                        self.sparv_done = (self._started_datetime() +
+                                           datetime.timedelta(seconds=real_seconds)).isoformat()
+                    continue
                 try:
-                    json_output = json.loads(line)
+                    json_output = orjson.loads(line)
                     msg = json_output.get("message")
                     if json_output.get("level") == "FINAL" and msg == "Nothing to be done.":
                         progress = 100
@@ -401,15 +477,8 @@ class Job():
                         errors.append("ERROR " + msg)
                     else:
                         misc.append(msg)
-                except json.JSONDecodeError:
-                    # Catch "real" time output
-                    if re.match(r"real \d.+", line):
-                        real_seconds = float(line[5:].strip())
-                        self.sparv_done = (dateutil.parser.isoparse(self.started) +
-                                        datetime.timedelta(seconds=real_seconds)).isoformat()
-                    # Ignore "user" and "sys" time output
-                    elif re.match(r"user|sys \d.+", line):
-                        pass
+                except orjson.JSONDecodeError:
+                    pass
 
             self.progress_output = progress
 
@@ -419,6 +488,12 @@ class Job():
 
         return warnings, errors, misc
 
+    def _started_datetime(self):
+        """Get the start time as a datetime object (parsing 'started' only when it has changed)."""
+        if self._parsed_started[0] != self.started:
+            self._parsed_started = (self.started, datetime.datetime.fromisoformat(self.started))
+        return self._parsed_started[1]
+
     @property
     def seconds_taken(self):
         """Calculate the time it took to process the corpus until it finished, aborted or until now.
@@ -430,12 +505,12 @@ class Job():
             seconds_taken = 0
         elif self.status.is_running(self.current_process):
             now = datetime.datetime.now(datetime.timezone.utc)
-            delta = now - dateutil.parser.isoparse(self.started)
+            delta = now - self._started_datetime()
             seconds_taken = max(self.latest_seconds_taken, delta.total_seconds())
         elif self.sparv_done or self.status.is_error(self.current_process):
-            delta = dateutil.parser.isoparse(self.sparv_done) - dateutil.parser.isoparse(self.started)
+            delta = datetime.datetime.fromisoformat(self.sparv_done) - self._started_datetime()
             seconds_taken = max(self.latest_seconds_taken, delta.total_seconds())
-            self.done = (dateutil.parser.isoparse(self.started) + datetime.timedelta(seconds=seconds_taken)).isoformat()
+            self.done = (self._started_datetime() + datetime.timedelta(seconds=seconds_taken)).isoformat()
         else:
             # TODO: This should never happen!
             app.logger.error(f"Something went wrong while calculating time taken. Job status: {self.status}; "
@@ -464,33 +539,41 @@ class Job():
         remote_corpus_dir = str(storage.get_corpus_dir(self.id))
         local_corpus_dir = str(utils.get_resource_dir(self.id, mkdir=True))
 
-        # Get exports from Sparv
+        # Get exports and plain text sources from Sparv (both transfers are run in parallel)
         remote_export_dir = sparv_utils.get_export_dir(self.id)
-        p = subprocess.run(["rsync", "-av", f"{self.sparv_user}@{self.sparv_server}:~/{remote_export_dir}",
-                            local_corpus_dir], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if p.stderr:
-            self.set_status(Status.error)
-            return utils.response("Failed to retrieve Sparv exports", err=True, info=p.stderr.decode()), 500
-
-        # Get plain text sources from Sparv
         remote_work_dir = sparv_utils.get_work_dir(self.id)
-        p = subprocess.run(["rsync", "-av", "--include=@text", "--include=*/", "--exclude=*", "--prune-empty-dirs",
-                            f"{self.sparv_user}@{self.sparv_server}:~/{remote_work_dir}",
-                            local_corpus_dir], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        ssh_args = utils.rsync_ssh_args(self.sparv_user, self.sparv_server)
+        export_p = subprocess.Popen(["rsync", "-av", *ssh_args,
+                                     f"{self.sparv_user}@{self.sparv_server}:~/{remote_export_dir}", local_corpus_dir],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        work_p = subprocess.Popen(["rsync", "-av", *ssh_args, "--include=@text", "--include=*/", "--exclude=*",
+                                   "--prune-empty-dirs", f"{self.sparv_user}@{self.sparv_server}:~/{remote_work_dir}",
+                                   local_corpus_dir], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _, export_stderr = export_p.communicate()
+        work_p.communicate()
+        if export_stderr:
+            self.set_status(Status.error)
+            return utils.response("Failed to retrieve Sparv exports", err=True, info=export_stderr.decode()), 500
 
-        # Transfer exports to the storage server
+        # Transfer exports and plain text sources to the storage server
         local_export_dir = utils.get_export_dir(self.id)
+        local_work_dir = utils.get_work_dir(self.id)
+        flask_app = app._get_current_object()
+
+        def upload(local_dir):
+            with flask_app.app_context():
+                storage.upload_dir(remote_corpus_dir, local_dir, self.id)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            export_upload = executor.submit(upload, local_export_dir)
+            work_upload = executor.submit(upload, local_work_dir)
         try:
-            storage.upload_dir(remote_corpus_dir, local_export_dir, self.id)
+            export_upload.result()
         except Exception as e:
             self.set_status(Status.error)
             raise Exception(f"Failed to upload exports to the storage server! {e}")
-
-        # Transfer plain text sources to the storage server
-        local_work_dir = utils.get_work_dir(self.id)
         try:
-            app.logger.warning(local_work_dir)
-            storage.upload_dir(remote_corpus_dir, local_work_dir, self.id)
+            work_upload.result()
         except Exception as e:
             self.set_status(Status.error)
             app.logger.warning(e)
@@ -553,60 +636,45 @@ class DefaultJob():
         self.remote_corpus_dir = str(sparv_utils.get_corpus_dir(self.lang, default_dir=True))
         self.config_file = app.config.get("SPARV_CORPUS_CONFIG")
 
-    def list_languages(self):
-        """List the languages available in Sparv."""
-        # Create and corpus dir with config file on Sparv server
-        p = utils.ssh_run(f"mkdir -p {shlex.quote(self.remote_corpus_dir)} && "
-                          f"echo 'metadata:\n  language: {self.lang}' > "
-                          f"{shlex.quote(self.remote_corpus_dir + '/' + self.config_file)}")
-        if p.stderr:
-            raise Exception(f"Failed to list languages! {p.stderr.decode()}")
+    def _run_sparv(self, sparv_args):
+        """Run Sparv with 'sparv_args' in the default corpus dir and return its output.
 
+        The corpus dir and its config file are created in the same call to the Sparv server.
+        """
         sparv_env = app.config.get("SPARV_ENVIRON")
-        sparv_command = f"{app.config.get('SPARV_COMMAND')} languages"
-        p = utils.ssh_run(f"cd {shlex.quote(self.remote_corpus_dir)} && {sparv_env} {sparv_command}")
+        sparv_command = f"{app.config.get('SPARV_COMMAND')} {sparv_args}"
+        p = utils.ssh_run(f"mkdir -p {shlex.quote(self.remote_corpus_dir)} && "
+                          f"echo 'metadata:\n  language: {self.lang}' > "
+                          f"{shlex.quote(self.remote_corpus_dir + '/' + self.config_file)} && "
+                          f"cd {shlex.quote(self.remote_corpus_dir)} && {sparv_env} {sparv_command}")
 
         if p.returncode != 0:
             stderr = p.stderr.decode() if p.stderr else ""
             raise exceptions.JobError(f"Failed to run Sparv! {stderr}")
 
+        return p.stdout.decode() if p.stdout else ""
+
+    def list_languages(self):
+        """List the languages available in Sparv."""
+        stdout = self._run_sparv("languages")
         languages = []
-        stdout = p.stdout.decode() if p.stdout else ""
         lines = [line.strip() for line in stdout.split("\n") if line.strip()][1:]
         for line in lines:
             if line.startswith("Supported language varieties"):
                 break
-            matchobj = re.match(r"(.+?)\s+(\S+)$", line)
+            matchobj = LANGUAGE_RE.match(line)
             if matchobj:
                 languages.append({"name": matchobj.group(1), "code": matchobj.group(2)})
         return languages
 
     def list_exports(self):
         """List the available exports for the current language."""
-        # Create and corpus dir with config file on Sparv server
-        p = utils.ssh_run(f"mkdir -p {shlex.quote(self.remote_corpus_dir)} && "
-                          f"echo 'metadata:\n  language: {self.lang}' > "
-                          f"{shlex.quote(self.remote_corpus_dir + '/' + self.config_file)}")
-        if p.stderr:
-            raise Exception(f"Failed to list exports! {p.stderr.decode()}")
-
-        sparv_env = app.config.get("SPARV_ENVIRON")
-        sparv_command = f"{app.config.get('SPARV_COMMAND')} run -l"
-        p = utils.ssh_run(f"cd {shlex.quote(self.remote_corpus_dir)} && {sparv_env} {sparv_command}")
-
-        if p.returncode != 0:
-            stderr = p.stderr.decode() if p.stderr else ""
-            raise exceptions.JobError(f"Failed to run Sparv! {stderr}")
-
-        exports = []
-        stdout = p.stdout.decode() if p.stdout else ""
+        stdout = self._run_sparv("run -l")
+        # Skip the heading and the last line
         lines = [line for line in stdout.split("\n") if line.strip()][1:-1]
-        for line in lines:
-            if line.startswith("    "):
-                exports[-1]["description"] += " " + line.strip()
-            else:
-                matchobj = re.match(r"(\S+)\s+(.+)$", line.strip())
-                if matchobj:
-                    if matchobj.group(1) not in ["Other", "Note:", "what", "'export.default'"]:
-                        exports.append({"export": matchobj.group(1), "description": matchobj.group(2)})
+        exports = []
+        for matchobj in EXPORT_RE.finditer("\n".join(lines)):
+            if matchobj.group(1) not in IGNORED_EXPORT_NAMES:
+                description = " ".join(line.strip() for line in matchobj.group(2).split("\n"))
+                exports.append({"export": matchobj.group(1), "description": description})
         return exports
@@ -36,11 +36,11 @@ def initialize():
             if f == queue_file:
                 continue
             if f.is_file():
-                with f.open() as fobj:
-                    infoobj = info.load_from_str(fobj.read())
-                    infoobj.update()  # Update resource in file system and add to cache
-                    all_resources.append(infoobj.id)
-                    # app.logger.debug(f"Job in cache: '{g.cache.get_job(job.id)}'")
+                # Backup files are UTF-8 encoded JSON, which orjson reads directly from bytes
+                infoobj = info.load_from_str(f.read_bytes())
+                infoobj.update()  # Update resource in file system and add to cache
+                all_resources.append(infoobj.id)
+                # app.logger.debug(f"Job in cache: '{g.cache.get_job(job.id)}'")
                 # Queue job unless it is done, aborted or erroneous
                 if infoobj.id not in queue:
                     if not (infoobj.job.status.is_done(infoobj.job.current_process) or infoobj.job.status.is_inactive()):
@@ -57,8 +57,9 @@ def get_all_resources() -> str:
 
 def get(resource_id) -> info.Info:
     """Get an existing info instance from the cache."""
-    if g.cache.get_job(resource_id) is not None:
-        return info.load_from_str(g.cache.get_job(resource_id))
+    jsonstr = g.cache.get_job(resource_id)
+    if jsonstr is not None:
+        return info.load_from_str(jsonstr)
     else:
         raise exceptions.JobNotFound(f"No resource found with ID '{resource_id}'!")
 
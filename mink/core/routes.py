@@ -8,6 +8,7 @@ from flask import current_app as app
 from flask import jsonify, redirect, render_template, send_from_directory, url_for
 
 from mink.core import utils
+from mink.core.status import Status
 
 
 bp = Blueprint("general", __name__)
@@ -65,7 +66,6 @@ def developers_guide_files(path):
 @bp.route("/info")
 def info():
     """Show info about data processing."""
-    from mink.core.status import Status
     status_codes = {
         "info": "job status codes",
         "data": []
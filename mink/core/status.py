@@ -27,6 +27,13 @@ class ProcessName(Enum):
     strix = "strix"
 
 
+STATUS_BY_NAME = dict(Status.__members__)
+ACTIVE_STATUSES = frozenset((Status.waiting, Status.running))
+INACTIVE_STATUSES = frozenset((Status.none, Status.done, Status.error, Status.aborted))
+OUTPUT_STATUSES = frozenset((Status.running, Status.done, Status.error))  # Statuses with Sparv output
+SYNC_PROCESSES = frozenset((ProcessName.sync2sparv, ProcessName.sync2storage))
+
+
 class JobStatuses(dict):
     """Class for representing the statuses of the different job processes."""
 
@@ -36,7 +43,7 @@ class JobStatuses(dict):
         if not isinstance(status, dict):
             status = {}
 
-        mapping = [(pn.name, getattr(Status, status.get(pn.name, ""), Status.none)) for pn in ProcessName]
+        mapping = [(pn.name, STATUS_BY_NAME.get(status.get(pn.name), Status.none)) for pn in ProcessName]
         dict.__init__(self, mapping)
 
     def __str__(self):
@@ -49,13 +56,12 @@ class JobStatuses(dict):
     def is_active(self, process_name=None):
         """Check if status is active."""
         if process_name:
-            return self.get(process_name) in [Status.waiting, Status.running]
-        return any(status in [Status.waiting, Status.running] for status in self.values())
+            return self.get(process_name) in ACTIVE_STATUSES
+        return any(status in ACTIVE_STATUSES for status in self.values())
 
     def is_inactive(self):
         """Check if status is inactive."""
-        return all(status in [Status.none, Status.done, Status.error, Status.aborted]
-                   for status in self.values())
+        return all(status in INACTIVE_STATUSES for status in self.values())
 
     def is_syncing(self):
         """Check if status is syncing."""
@@ -102,6 +108,6 @@ class JobStatuses(dict):
         """Check if process is expected to have process output."""
         if process_name is None:
             return False
-        if process_name not in [ProcessName.sync2sparv, ProcessName.sync2storage]:
-            return self.get(process_name) in [Status.running, Status.done, Status.error]
+        if process_name not in SYNC_PROCESSES:
+            return self.get(process_name) in OUTPUT_STATUSES
         return False
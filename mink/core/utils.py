@@ -1,12 +1,20 @@
 """General utility functions."""
 
+import copy
+import fcntl
 import functools
 import gzip
-import json
+import os
+import shlex
+import shutil
+import socket
 import subprocess
+import tempfile
+import xml.etree.ElementTree as etree
 import zipfile
 from pathlib import Path
 
+import orjson
 import yaml
 from flask import Response
 from flask import current_app as app
@@ -14,6 +22,14 @@ from flask import g, request
 
 from mink.sparv import storage
 
+# Use the fast libyaml based loader and dumper if PyYAML was built with libyaml
+try:
+    from yaml import CSafeDumper as YamlDumper
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+    from yaml import SafeLoader as YamlLoader
+
 
 def response(msg, err=False, **kwargs):
     """Create json error response."""
@@ -27,7 +43,7 @@ def response(msg, err=False, **kwargs):
     for key, value in kwargs.items():
         if value != "":
             res[key] = value
-    return Response(json.dumps(res, ensure_ascii=False), mimetype="application/json")
+    return Response(orjson.dumps(res, option=orjson.OPT_NON_STR_KEYS), mimetype="application/json")
 
 
 def gatekeeper(function):
@@ -42,23 +58,78 @@ def gatekeeper(function):
     return decorator
 
 
+def ssh_options(user, host):
+    """Get options for ssh connections to host.
+
+    If SSH_CONTROL_DIR is set, all connections to the same host share one persistent master connection, so that only
+    the first command has to pay for connecting and authenticating.
+    """
+    options = ["-i", app.config.get("SSH_KEY")]
+    control_dir = app.config.get("SSH_CONTROL_DIR")
+    if control_dir:
+        control_path = Path(control_dir) / f"mink-{user}@{host}"
+        if not _control_socket_alive(control_path):
+            # Only one process or thread at a time may start the master, so that no one removes a socket that was
+            # just created by someone else. Never wait for the lock (that would block the whole worker under gevent),
+            # use a direct connection instead while someone else is starting the master.
+            with open(f"{control_path}.lock", "w") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return options
+                if not _control_socket_alive(control_path):
+                    # Remove stale socket (e.g. after a reboot), ssh would otherwise complain about it on every call
+                    control_path.unlink(missing_ok=True)
+                    # Start a master connection which stays in the background for later commands. Its stdio must not
+                    # be connected to pipes, otherwise reading the output of a command could block until the master
+                    # exits.
+                    subprocess.run(["ssh", *options, "-o", f"ControlPath={control_path}", "-o", "ControlMaster=auto",
+                                    "-o", f"ControlPersist={app.config.get('SSH_CONTROL_PERSIST')}", f"{user}@{host}",
+                                    "true"],
+                                   stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        options.extend(["-o", f"ControlPath={control_path}"])
+    return options
+
+
+def _control_socket_alive(control_path):
+    """Check if there is a master connection listening on the ssh control socket."""
+    try:
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(str(control_path))
+        return True
+    except OSError:
+        return False
+
+
 def ssh_run(command, input=None):
     """Execute 'command' on server and return process."""
     user = app.config.get("SPARV_USER")
     host = app.config.get("SPARV_HOST")
-    p = subprocess.run(["ssh", "-i", app.config.get("SSH_KEY"), f"{user}@{host}", command],
+    p = subprocess.run(["ssh", *ssh_options(user, host), f"{user}@{host}", command],
                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, input=input)
     return p
 
 
+def rsync_ssh_args(user, host):
+    """Get rsync arguments for connecting to host with the same ssh options as 'ssh_run' (sharing its connection)."""
+    return ["-e", " ".join(shlex.quote(str(option)) for option in ["ssh", *ssh_options(user, host)])]
+
+
 def uncompress_gzip(inpath, outpath=None):
     """Uncompress file with with gzip and safe to outpath (or inpath if no outpath is given."""
-    with gzip.open(inpath, "rb") as z:
-        data = z.read()
-        if outpath is None:
-            outpath = inpath
-        with open(outpath, "wb") as f:
-            f.write(data)
+    if outpath is None:
+        outpath = inpath
+    # Stream into a temporary file next to outpath and move it into place afterwards, since the file may be
+    # uncompressed in place
+    with tempfile.NamedTemporaryFile(dir=Path(outpath).parent, delete=False) as f:
+        try:
+            with gzip.open(inpath, "rb") as z:
+                shutil.copyfileobj(z, f, 128 * 1024)
+        except Exception:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, outpath)
 
 
 def create_zip(inpath, outpath, zip_rootdir=None):
@@ -66,34 +137,41 @@ def create_zip(inpath, outpath, zip_rootdir=None):
 
     zip_rootdir: name that the root folder inside the zip file should be renamed to.
     """
-    zipf = zipfile.ZipFile(outpath, "w")
-    if Path(inpath).is_file():
-        zipf.write(inpath, Path(inpath).name)
-    else:
-        for filepath in Path(inpath).rglob("*"):
-            zippath = filepath.relative_to(Path(inpath).parent)
-            if zip_rootdir:
-                zippath = Path(zip_rootdir) / Path(*zippath.parts[1:])
-            zipf.write(filepath, zippath)
-    zipf.close()
+    inpath = Path(inpath)
+    # Compress with the fastest level, exports are mostly text which compresses well anyway
+    with zipfile.ZipFile(outpath, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
+        if inpath.is_file():
+            zipf.write(inpath, inpath.name)
+        else:
+            for filepath in inpath.rglob("*"):
+                zippath = filepath.relative_to(inpath.parent)
+                if zip_rootdir:
+                    zippath = Path(zip_rootdir, *zippath.parts[1:])
+                zipf.write(filepath, zippath)
 
 
 def check_file_ext(filename, valid_extensions=None) -> bool:
-    """Check if file extension is valid."""
-    filename = Path(filename)
+    """Check if file extension is valid.
+
+    valid_extensions should be a collection with fast lookups (e.g. a set or a dict keyed by lower case extensions).
+    """
     if valid_extensions:
-        if not any(i.lower() == filename.suffix.lower() for i in valid_extensions):
-            return False
+        return os.path.splitext(filename)[1].lower() in valid_extensions
     return True
 
 
-def check_file_compatible(filename, source_dir):
-    """Check if the file extension of filename is identical to the first file in source_dir."""
-    existing_files = storage.list_contents(str(source_dir))
-    current_ext = Path(filename).suffix
-    if not existing_files:
-        return True, current_ext, None
-    existing_ext = Path(existing_files[0].get("name")).suffix
+def check_file_compatible(filename, source_dir, existing_ext=None):
+    """Check if the file extension of filename is identical to the first file in source_dir.
+
+    If the extension of the existing files is already known, it can be given as 'existing_ext' to avoid listing
+    source_dir on the Sparv server.
+    """
+    current_ext = os.path.splitext(filename)[1]
+    if existing_ext is None:
+        existing_files = storage.list_contents(str(source_dir))
+        if not existing_files:
+            return True, current_ext, None
+        existing_ext = os.path.splitext(existing_files[0].get("name"))[1]
     return current_ext == existing_ext, current_ext, existing_ext
 
 
@@ -107,20 +185,37 @@ def check_size_ok(source_dir, incoming_size):
     return True
 
 
-def validate_xml(file_contents):
-    """Check if inputfile is valid XML."""
-    import xml.etree.ElementTree as etree
+class _NoTreeBuilder:
+    """Parser target that ignores all parser events, used for checking well-formedness without building a tree."""
+
+
+def validate_xml(xml_file, chunk_size=64 * 1024):
+    """Check if xml_file (a binary file object) is valid XML."""
+    parser = etree.XMLParser(target=_NoTreeBuilder())
     try:
-        etree.fromstring(file_contents)
+        # Feed the parser in chunks so that it can stop at the first error without reading the whole file
+        for chunk in iter(lambda: xml_file.read(chunk_size), b""):
+            parser.feed(chunk)
+        parser.close()
         return True
     except etree.ParseError:
         return False
 
 
+@functools.lru_cache(maxsize=32)
+def _load_config(config):
+    """Parse a corpus config.
+
+    The same config is usually parsed several times while handling one upload, so the result is cached. It must
+    therefore not be modified by the caller.
+    """
+    return yaml.load(config, Loader=YamlLoader)
+
+
 def config_compatible(config, source_file):
     """Check if the importer module in the corpus config is compatible with the source files."""
-    file_ext = Path(source_file.get("name")).suffix
-    config_yaml = yaml.load(config, Loader=yaml.FullLoader)
+    file_ext = os.path.splitext(source_file.get("name"))[1]
+    config_yaml = _load_config(config)
     current_importer = config_yaml.get("import", {}).get("importer", "").split(":")[0] or None
     importer_dict = app.config.get("SPARV_IMPORTER_MODULES", {})
 
@@ -138,7 +233,9 @@ def config_compatible(config, source_file):
 
 def standardize_config(config, corpus_id):
     """Set the correct corpus ID and remove the compression setting in the corpus config."""
-    config_yaml = yaml.load(config, Loader=yaml.FullLoader)
+    # Copy the cached config before modifying it
+    original_yaml = _load_config(config)
+    config_yaml = copy.deepcopy(original_yaml)
 
     # Set correct corpus ID
     if config_yaml.get("metadata", {}).get("id") != corpus_id:
@@ -173,17 +270,27 @@ def standardize_config(config, corpus_id):
         if "<text>:misc.id as _id" not in config_yaml["export"]["annotations"]:
             config_yaml["export"]["annotations"].append("<text>:misc.id as _id")
 
-    return yaml.dump(config_yaml, sort_keys=False, allow_unicode=True), name
+    # Skip the (comparatively slow) serialization if the config already was standardized
+    if config_yaml == original_yaml:
+        if isinstance(config, str):
+            return config, name
+        try:
+            return config.decode("UTF-8"), name
+        except UnicodeDecodeError:
+            # The config may be in another encoding understood by YAML (e.g. UTF-16), so it needs to be dumped
+            pass
+
+    return yaml.dump(config_yaml, Dumper=YamlDumper, sort_keys=False, allow_unicode=True), name
 
 
 def standardize_metadata_yaml(yamlf):
     """Get resource name from metadata yaml and remove comments etc."""
-    yaml_contents = yaml.load(yamlf, Loader=yaml.FullLoader)
+    yaml_contents = yaml.load(yamlf, Loader=YamlLoader)
 
     # Get resource name
     name = yaml_contents.get("name", {})
 
-    return yaml.dump(yaml_contents, sort_keys=False, allow_unicode=True), name
+    return yaml.dump(yaml_contents, Dumper=YamlDumper, sort_keys=False, allow_unicode=True), name
 
 
 ################################################################################
@@ -192,23 +299,22 @@ def standardize_metadata_yaml(yamlf):
 
 def get_resources_dir(mkdir: bool = False) -> Path:
     """Get user specific dir for corpora."""
-    resources_dir = Path(app.instance_path) / Path(app.config.get("TMP_DIR")) / g.request_id
+    resources_dir = Path(app.instance_path, app.config.get("TMP_DIR"), g.request_id)
     if mkdir:
         resources_dir.mkdir(parents=True, exist_ok=True)
     return resources_dir
 
 def get_resource_dir(resource_id: str, mkdir: bool = False) -> Path:
     """Get dir for given resource."""
-    resources_dir = get_resources_dir(mkdir=mkdir)
-    resdir = resources_dir / Path(resource_id)
+    # Parent dirs are created along with the requested dir, so they are not created separately
+    resdir = get_resources_dir() / resource_id
     if mkdir:
         resdir.mkdir(parents=True, exist_ok=True)
     return resdir
 
 def get_export_dir(corpus_id: str, mkdir: bool = False) -> Path:
     """Get export dir for given resource."""
-    resdir = get_resource_dir(corpus_id, mkdir=mkdir)
-    export_dir = resdir / Path(app.config.get("SPARV_EXPORT_DIR"))
+    export_dir = get_resource_dir(corpus_id) / app.config.get("SPARV_EXPORT_DIR")
     if mkdir:
         export_dir.mkdir(parents=True, exist_ok=True)
     return export_dir
@@ -216,8 +322,7 @@ def get_export_dir(corpus_id: str, mkdir: bool = False) -> Path:
 
 def get_work_dir(corpus_id: str, mkdir: bool = False) -> Path:
     """Get sparv workdir for given corpus."""
-    resdir = get_resource_dir(corpus_id, mkdir=mkdir)
-    work_dir = resdir / Path(app.config.get("SPARV_WORK_DIR"))
+    work_dir = get_resource_dir(corpus_id) / app.config.get("SPARV_WORK_DIR")
     if mkdir:
         work_dir.mkdir(parents=True, exist_ok=True)
     return work_dir
@@ -225,8 +330,7 @@ def get_work_dir(corpus_id: str, mkdir: bool = False) -> Path:
 
 def get_source_dir(corpus_id: str, mkdir: bool = False) -> Path:
     """Get source dir for given corpus."""
-    resdir = get_resource_dir(corpus_id, mkdir=mkdir)
-    source_dir = resdir / Path(app.config.get("SPARV_SOURCE_DIR"))
+    source_dir = get_resource_dir(corpus_id) / app.config.get("SPARV_SOURCE_DIR")
     if mkdir:
         source_dir.mkdir(parents=True, exist_ok=True)
     return source_dir
@@ -234,8 +338,7 @@ def get_source_dir(corpus_id: str, mkdir: bool = False) -> Path:
 
 def get_config_file(corpus_id: str) -> Path:
     """Get path to corpus config file."""
-    resdir = get_resource_dir(corpus_id)
-    return resdir / Path(app.config.get("SPARV_CORPUS_CONFIG"))
+    return get_resource_dir(corpus_id) / app.config.get("SPARV_CORPUS_CONFIG")
 
 
 def get_metadata_yaml_file(resource_id: str) -> Path:
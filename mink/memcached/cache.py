@@ -5,7 +5,7 @@ from pathlib import Path
 from flask import current_app as app
 from flask import g
 from pymemcache import serde
-from pymemcache.client.base import Client
+from pymemcache.client.base import PooledClient
 
 from mink.core import registry
 
@@ -29,10 +29,16 @@ class Cache():
         self.connect()
 
     def connect(self):
-        """Connect to the memcached socket and set client."""
-        socket_path = Path(app.instance_path) / app.config.get("MEMCACHED_SOCKET")
+        """Connect to the memcached socket and set client.
+
+        The client is created once per app and shared between requests. It keeps a pool of open connections to the
+        socket so that a new connection does not have to be opened for every request.
+        """
         try:
-            self.client = Client(f"unix:{socket_path}", serde=serde.pickle_serde)
+            if "memcached" not in app.extensions:
+                socket_path = Path(app.instance_path) / app.config.get("MEMCACHED_SOCKET")
+                app.extensions["memcached"] = PooledClient(f"unix:{socket_path}", serde=serde.pickle_serde)
+            self.client = app.extensions["memcached"]
             # Check if connection is working
             self.client.get("test")
         except Exception as e:
@@ -1,6 +1,5 @@
 """Routes related to storing metadata files."""
 
-import requests
 import shortuuid
 from flask import Blueprint
 from flask import current_app as app
@@ -43,7 +42,7 @@ def create_metadata(user: dict, auth_token: str):
     # Check availability of ID in SBX metadata and the Mink backend resource registry
     check_id_url = app.config.get("METADATA_ID_AVAILABLE_URL") + public_id
     try:
-        id_available = requests.get(check_id_url).json().get("available", False)
+        id_available = app.extensions["http_session"].get(check_id_url).json().get("available", False)
     except Exception as e:
         return utils.response("Failed to create resource: failed to check ID availability", err=True, info=str(e),
                               return_code="failed_creating_resource"), 500
@@ -82,9 +81,9 @@ def create_metadata(user: dict, auth_token: str):
         return utils.response("Failed to create resource", err=True, info=str(e),
                             return_code="failed_creating_resource"), 500
 
-    # Create metadata resource dir with sources subdir
+    # Create metadata resource dir with sources subdir (creating the source dir creates the resource dir too)
+    resource_dir = str(storage.get_resource_dir(resource_id))
     try:
-        resource_dir = str(storage.get_resource_dir(resource_id, mkdir=True))
         storage.get_source_dir(resource_id, mkdir=True)
         return utils.response(f"Resource '{resource_id}' created successfully", resource_id=resource_id,
                               return_code="created_resource"), 201
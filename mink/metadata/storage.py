@@ -6,7 +6,6 @@ import subprocess
 from pathlib import Path
 from typing import Optional, Union
 
-from dateutil.parser import parse
 from flask import current_app as app
 
 from mink.core import utils
@@ -55,7 +54,7 @@ def download_file(remote_file_path: str, local_file: Path, resource_id: str, ign
         raise Exception(f"You don't have permission to download '{remote_file_path}'")
 
     user, host = _get_login()
-    cmd = ["rsync", "--protect-args"]
+    cmd = ["rsync", "--protect-args", *utils.rsync_ssh_args(user, host)]
     if ignore_missing:
         cmd.append("--ignore-missing-args")
     cmd += [f"{user}@{host}:{remote_file_path}", f"{local_file}"]
@@ -9,8 +9,8 @@ import traceback
 from pathlib import Path
 
 import jwt
-import requests
 import shortuuid
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
 from flask import Blueprint
 from flask import current_app as app
 from flask import g, request, session
@@ -20,6 +20,9 @@ from mink.core.user import User
 
 bp = Blueprint("sb_auth_login", __name__)
 
+# Characters that are removed when creating user IDs
+USER_ID_INVALID_CHARS_RE = re.compile(r"[^\w\-_\.]")
+
 
 def login(include_read=False, require_resource_id=True, require_resource_exists=True, require_admin=False):
     """Attempt to login on sb-auth.
@@ -128,8 +131,9 @@ def admin_mode_status():
 
 
 def read_jwt_key():
-    """Read and return the public key for validating JWTs."""
-    app.config["JWT_KEY"] = open(Path(app.instance_path) / app.config.get("SBAUTH_PUBKEY_FILE")).read()
+    """Read the public key for validating JWTs and store it in parsed form (to avoid parsing it for every request)."""
+    with open(Path(app.instance_path) / app.config.get("SBAUTH_PUBKEY_FILE"), "rb") as f:
+        app.config["JWT_KEY"] = load_pem_public_key(f.read())
 
 
 def _get_resources(auth_token, include_read=False):
@@ -155,7 +159,7 @@ def _get_resources(auth_token, include_read=False):
         for metadata, level in user_token["scope"].get("metadata", {}).items():
             if level >= user_token["levels"][min_level] and corpus.startswith(app.config.get("RESOURCE_PREFIX")):
                 resources.append(metadata)
-    user = re.sub(r"[^\w\-_\.]", "", (user_token["idp"] + "-" + user_token["sub"]))
+    user = USER_ID_INVALID_CHARS_RE.sub("", (user_token["idp"] + "-" + user_token["sub"]))
     username = user_token.get("name", "")
     email = user_token.get("email", "")
     return user, resources, mink_admin, username, email
@@ -169,7 +173,7 @@ def create_resource(auth_token, resource_id, resource_type=None):
     headers = {"Authorization": f"apikey {api_key}", "Content-Type": "application/json"}
     data = {"jwt": auth_token}
     try:
-        r = requests.post(url, headers=headers, data=json.dumps(data))
+        r = app.extensions["http_session"].post(url, headers=headers, data=json.dumps(data))
         status = r.status_code
     except Exception as e:
         app.logger.error(f"Could not create resource: {e}")
@@ -188,7 +192,7 @@ def remove_resource(resource_id) -> bool:
     api_key = app.config.get("SBAUTH_API_KEY")
     headers = {"Authorization": f"apikey {api_key}"}
     try:
-        r = requests.delete(url, headers=headers)
+        r = app.extensions["http_session"].delete(url, headers=headers)
         status = r.status_code
     except Exception as e:
         raise e
@@ -68,11 +68,12 @@ def run_sparv(resource_id: str):
 
     info = registry.get(resource_id)
     job = info.job
-    job.set_sparv_exports(sparv_exports)
-    job.set_current_files(current_files)
+    with job.batch():
+        job.set_sparv_exports(sparv_exports)
+        job.set_current_files(current_files)
+        job.reset_time()
 
     # Queue job
-    job.reset_time()
     try:
         job = registry.add_to_queue(job)
     except Exception as e:
@@ -264,8 +265,9 @@ def install_korp(resource_id: str):
     # Queue job
     info = registry.get(resource_id)
     job = info.job
-    job.reset_time()
-    job.set_install_scrambled(scramble)
+    with job.batch():
+        job.reset_time()
+        job.set_install_scrambled(scramble)
     try:
         job = registry.add_to_queue(job)
     except Exception as e:
@@ -1,12 +1,13 @@
 """Functions related to storage on Sparv server."""
 
+import datetime
+import functools
 import mimetypes
 import shlex
 import subprocess
 from pathlib import Path
 from typing import Optional, Union
 
-from dateutil.parser import isoparse, parse
 from flask import current_app as app
 
 from mink.core import exceptions, utils
@@ -23,21 +24,21 @@ def list_contents(directory: Union[Path, str], exclude_dirs: bool = True,
     """
     objlist = []
     directory_quoted = shlex.quote(str(directory))
+    # Print type, size, modification time (timestamp and UTC offset) and relative path of every file and directory
     p = utils.ssh_run(f"test -d {directory_quoted} && cd {directory_quoted} && "
-                      f"find . -exec ls -lgGd --time-style=full-iso {{}} \\;")
+                      f"find . -mindepth 1 -printf '%y\\t%s\\t%T@\\t%Tz\\t%P\\0'")
     if p.stderr:
         raise Exception(f"Failed to list contents of '{directory}': {p.stderr.decode()}")
 
     contents = p.stdout.decode()
-    for line in contents.split("\n"):
-        if not line.strip():
-            continue
-        permissions, _, size, date, time, tz, obj_path = line.split(maxsplit=6)
-        if obj_path == ".":
+    for entry in contents.split("\0"):
+        if not entry:
             continue
+        obj_type, size, timestamp, utc_offset, obj_path = entry.split("\t", 4)
         f = Path(obj_path)
-        mod_time = parse(f"{date} {time} {tz}").isoformat(timespec="seconds")
-        is_dir = permissions.startswith("d")
+        mod_time = datetime.datetime.fromtimestamp(float(timestamp), _get_timezone(utc_offset))
+        mod_time = mod_time.isoformat(timespec="seconds")
+        is_dir = obj_type == "d"
         mimetype = mimetypes.guess_type(str(f))[0] or "unknown"
         if is_dir:
             if exclude_dirs:
@@ -47,18 +48,25 @@ def list_contents(directory: Union[Path, str], exclude_dirs: bool = True,
             if any(Path(f.parts[0]).match(item) for item in blacklist):
                 continue
         objlist.append({
-            "name": f.name, "type": mimetype, "last_modified": mod_time, "size": int(size), "path": obj_path[2:]
+            "name": f.name, "type": mimetype, "last_modified": mod_time, "size": int(size), "path": obj_path
         })
     return objlist
 
 
+@functools.lru_cache(maxsize=None)
+def _get_timezone(utc_offset: str) -> datetime.timezone:
+    """Get timezone for a UTC offset formatted like '+0200'."""
+    hours, minutes = int(utc_offset[:3]), int(utc_offset[0] + utc_offset[3:])
+    return datetime.timezone(datetime.timedelta(hours=hours, minutes=minutes))
+
+
 def download_file(remote_file_path: str, local_file: Path, resource_id: str, ignore_missing: bool = False):
     """Download a file from the Sparv server."""
     if not _is_valid_path(remote_file_path, resource_id):
         raise Exception(f"You don't have permission to download '{remote_file_path}'")
 
     user, host = _get_login()
-    cmd = ["rsync", "--protect-args"]
+    cmd = ["rsync", "--protect-args", *utils.rsync_ssh_args(user, host)]
     if ignore_missing:
         cmd.append("--ignore-missing-args")
     cmd += [f"{user}@{host}:{remote_file_path}", f"{local_file}"]
@@ -114,7 +122,7 @@ def download_dir(remote_dir, local_dir, resource_id, zipped=False, zippath=None,
         raise Exception("Parameter zippath needs to be supplied when 'zipped=True'")
 
     user, host = _get_login()
-    command = ["rsync", "--recursive"]
+    command = ["rsync", "--recursive", "--protect-args", *utils.rsync_ssh_args(user, host)]
     for e in excludes:
         command.append(f"--exclude={e}")
     command.extend([f"{user}@{host}:{remote_dir}/", f"{local_dir}"])
@@ -151,7 +159,8 @@ def upload_dir(remote_dir, local_dir, resource_id, delete=False):
 
     _make_dir(remote_dir)
     user, host = _get_login()
-    p = subprocess.run(["rsync"] + args + [f"{user}@{host}:{remote_dir}"],
+    p = subprocess.run(["rsync", "--protect-args", *utils.rsync_ssh_args(user, host)] + args +
+                       [f"{user}@{host}:{remote_dir}"],
                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     if p.stderr:
         raise Exception(f"Failed to upload to '{remote_dir}': {p.stderr.decode()}")
@@ -181,7 +190,7 @@ def get_file_changes(resource_id: str, job):
     """Get changes for source files and config file."""
     if not job.started:
         raise exceptions.JobNotFound
-    started = isoparse(job.started)
+    started = datetime.datetime.fromisoformat(job.started)
 
     # Get current source files
     source_dir = str(get_source_dir(resource_id))
@@ -203,7 +212,7 @@ def get_file_changes(resource_id: str, job):
     for sf in source_files:
         if sf in added_sources:
             continue
-        mod = isoparse(sf.get("last_modified"))
+        mod = datetime.datetime.fromisoformat(sf.get("last_modified"))
         if mod > started:
             changed_sources.append(sf)
 
@@ -220,7 +229,7 @@ def get_file_changes(resource_id: str, job):
     config_file = get_config_file(resource_id)
     for f in corpus_files:
         if f.get("name") == config_file.name:
-            config_mod = isoparse(f.get("last_modified"))
+            config_mod = datetime.datetime.fromisoformat(f.get("last_modified"))
             if config_mod > started:
                 changed_config = f
             break
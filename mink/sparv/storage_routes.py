@@ -1,5 +1,7 @@
 """Routes related to storage on Sparv server."""
 
+import concurrent.futures
+import os
 from pathlib import Path
 
 import shortuuid
@@ -50,9 +52,9 @@ def create_corpus(user: dict, auth_token: str):
     info_obj = Info(resource_id, owner=user)
     info_obj.create()
 
-    # Create corpus dir with subdirs
+    # Create corpus dir with subdirs (creating the source dir creates the corpus dir too, in a single ssh call)
+    corpus_dir = str(storage.get_corpus_dir(resource_id))
     try:
-        corpus_dir = str(storage.get_corpus_dir(resource_id, mkdir=True))
         storage.get_source_dir(resource_id, mkdir=True)
         return utils.response(f"Corpus '{resource_id}' created successfully", corpus_id=resource_id,
                               return_code="created_corpus"), 201
@@ -177,27 +179,35 @@ def upload_sources(resource_id: str):
     try:
         h_max_file_size = str(round(app.config.get("MAX_FILE_LENGTH", 0) / 1024 / 1024, 2))
         file_extension_warnings = []
-        # Upload data
+        existing_ext = None
+        uploads = {}
+        # Check all files before uploading any of them
         for f in files[0]:
             name = sparv_utils.secure_filename(f.filename)
-            if Path(name).suffix.lower() != Path(name).suffix:
-                new_name = str(Path(name).stem + Path(name).suffix.lower())
+            stem, ext = os.path.splitext(name)
+            if ext.lower() != ext:
+                new_name = stem + ext.lower()
                 file_extension_warnings.append((name, new_name))
                 name = new_name
-            if not utils.check_file_ext(name, app.config.get("SPARV_IMPORTER_MODULES", {}).keys()):
+            if not utils.check_file_ext(name, app.config.get("SPARV_IMPORTER_MODULES", {})):
                 return utils.response(f"Failed to upload some source files to '{resource_id}' due to invalid "
                                       "file extension", err=True, file=f.filename, info="invalid file extension",
                                       return_code="failed_uploading_sources_invalid_file_extension"), 400
-            compatible, current_ext, existing_ext = utils.check_file_compatible(name, source_dir)
+            compatible, current_ext, existing_ext = utils.check_file_compatible(name, source_dir, existing_ext)
             if not compatible:
                 return utils.response(f"Failed to upload some source files to '{resource_id}' due to incompatible "
                                       "file extensions", err=True, file=f.filename, info="incompatible file extensions",
                                       current_file_extension=current_ext, existing_file_extension=existing_ext,
                                       return_code="failed_uploading_sources_incompatible_file_extension"), 400
-            file_contents = f.read()
-
-            # Check file size constraint
-            if len(file_contents) > app.config.get("MAX_FILE_LENGTH"):
+            # All other files must have the same extension as this one, so the source dir only needs to be listed once
+            existing_ext = current_ext
+
+            # Check file size constraint (Werkzeug keeps larger uploads in temporary files, so get the size without
+            # reading the file into memory)
+            f.stream.seek(0, os.SEEK_END)
+            file_size = f.stream.tell()
+            f.stream.seek(0)
+            if file_size > app.config.get("MAX_FILE_LENGTH"):
                 return utils.response(f"Failed to upload some source files to '{resource_id}'. "
                                       f"Max file size ({h_max_file_size} MB) exceeded",
                                       info="max file size exceeded",
@@ -206,11 +216,26 @@ def upload_sources(resource_id: str):
 
             # Validate XML files
             if current_ext == ".xml":
-                if not utils.validate_xml(file_contents):
+                valid_xml = utils.validate_xml(f.stream)
+                f.stream.seek(0)
+                if not valid_xml:
                     return utils.response(f"Failed to upload some source files to '{resource_id}' due to invalid XML",
                                           err=True, file=f.filename, info="invalid XML",
                                           return_code="failed_uploading_sources_invalid_xml"), 400
-            storage.write_file_contents(str(source_dir / name), file_contents, resource_id)
+            uploads[str(source_dir / name)] = f
+
+        # Upload data (a few files at a time, sharing the ssh connection to the Sparv server). Files are only read
+        # into memory right before they are uploaded.
+        flask_app = app._get_current_object()
+
+        def upload(path, f):
+            with flask_app.app_context():
+                storage.write_file_contents(path, f.read(), resource_id)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(upload, path, f) for path, f in uploads.items()]
+        for future in futures:
+            future.result()
 
         res = registry.get(resource_id).resource
         res.set_source_files()
@@ -304,7 +329,7 @@ def download_sources(resource_id: str):
                               return_code="failed_listing_sources"), 500
 
     local_source_dir = utils.get_source_dir(resource_id, mkdir=True)
-    local_corpus_dir = utils.get_resource_dir(resource_id, mkdir=True)
+    local_corpus_dir = utils.get_resource_dir(resource_id)
 
     # Download and zip file specified in args
     if download_file:
@@ -468,7 +493,7 @@ def download_export(resource_id: str):
                               return_code="too_many_params_download_exports"), 400
 
     storage_export_dir = str(storage.get_export_dir(resource_id))
-    local_corpus_dir = utils.get_resource_dir(resource_id, mkdir=True)
+    local_corpus_dir = utils.get_resource_dir(resource_id)
     local_export_dir = utils.get_export_dir(resource_id, mkdir=True)
     blacklist = app.config.get("SPARV_EXPORT_BLACKLIST")
 
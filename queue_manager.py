@@ -11,6 +11,9 @@ from pathlib import Path
 from urllib import error, parse, request
 
 from apscheduler.schedulers.blocking import BlockingScheduler
+from flask import Config
+
+from config_utils import expand_env_vars
 
 
 def advance_queue(config):
@@ -41,16 +44,11 @@ def ping_healthchecks(config):
 
 
 def import_config():
-    """Import default and instance config."""
-    import config
-    my_config = {item: getattr(config, item) for item in dir(config) if item.isupper()}
-
-    instance_config_path = Path("instance") / "config.py"
-    if instance_config_path.is_file():
-        from instance import config as instance_config
-        Instance_Config = {item: getattr(instance_config, item) for item in dir(instance_config) if item.isupper()}
-        my_config.update(Instance_Config)
-
+    """Import default and instance config (the same way as the mink app does)."""
+    my_config = Config(Path.cwd())
+    my_config.from_object("config")
+    my_config.from_pyfile(Path("instance") / "config.py", silent=True)
+    expand_env_vars(my_config)
     return my_config
 
 